@@ -27,12 +27,18 @@ def main():
     crawl_parser.add_argument('url', help='The starting URL to crawl')
     crawl_parser.add_argument('--depth', type=int, default=3, help='Maximum crawl depth (default: 3)')
     crawl_parser.add_argument('--max-pages', type=int, default=100, help='Maximum number of pages to crawl (default: 100)')
-    crawl_parser.add_argument('--delay', type=float, default=1.0, help='Delay between requests in seconds (default: 1.0)')
+    crawl_parser.add_argument('--delay', type=float, default=1.0, help='Delay between requests to the same host in seconds (default: 1.0)')
+    crawl_parser.add_argument('--concurrency', type=int, default=10, help='Number of pages processed in parallel (default: 10)')
+    crawl_parser.add_argument('--workers', type=int, default=1, help='Number of crawler processes, sharded by URL hash (0 = half the CPU cores, default: 1)')
     crawl_parser.add_argument('--output-dir', default='sites', help='Output directory for crawled content (default: sites)')
     crawl_parser.add_argument('--user-agent', help='Custom User-Agent string')
     crawl_parser.add_argument('--verbose', action='store_true', help='Enable verbose logging')
     crawl_parser.add_argument('--follow-external', action='store_true', help='Follow external links')
     crawl_parser.add_argument('--include-assets', action='store_true', help='Download CSS, JS, and image files')
+    crawl_parser.add_argument('--no-fast-path', action='store_true', help='Always render pages in the browser instead of fetching static HTML over plain HTTP')
+    crawl_parser.add_argument('--no-sandbox', action='store_true', help="Disable Chromium's sandbox (always disabled when running as root)")
+    crawl_parser.add_argument('--js-text-extract', action='store_true', help="Read page text from the browser's rendered DOM instead of the HTML (for single-page apps; disables the fast path)")
+    crawl_parser.add_argument('--resume', action='store_true', help='Continue an interrupted crawl into the same output directory')
     crawl_parser.add_argument('--mapping', action='append', help='CSS selector to markdown mapping (e.g., "header:# Title", ".entry-content:# Content", "body > header:# Title")')
     
     # Parse arguments
@@ -43,6 +49,11 @@ def main():
         sys.exit(1)
     
     if args.command == 'crawl':
+        if args.workers < 0:
+            crawl_parser.error('--workers must be 0 or more')
+        if args.concurrency < 1:
+            crawl_parser.error('--concurrency must be at least 1')
+        
         # Setup logging
         log_level = logging.DEBUG if args.verbose else logging.INFO
         logger = setup_logger(log_level)
@@ -72,10 +83,16 @@ def main():
             'max_depth': args.depth,
             'max_pages': args.max_pages,
             'delay': args.delay,
+            'concurrency': args.concurrency,
+            'workers': args.workers,
             'output_dir': args.output_dir,
             'user_agent': args.user_agent,
             'follow_external': args.follow_external,
             'include_assets': args.include_assets,
+            'resume': args.resume,
+            'fast_path': not args.no_fast_path,
+            'no_sandbox': args.no_sandbox,
+            'js_text_extract': args.js_text_extract,
             'mappings': mappings if mappings else None
         }
         
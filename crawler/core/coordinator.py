@@ -0,0 +1,292 @@
+"""
+Multi-process crawling sharded by URL hash
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import queue
+import time
+from multiprocessing.connection import wait
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Set
+from urllib.parse import urlparse
+
+try:
+    import uvloop
+except ImportError:  # Not available on Windows
+    uvloop = None
+
+from crawlee import Request
+from crawlee.crawlers import PlaywrightCrawlingContext
+
+from .crawler import RECENT_CACHE_SIZE, Link, WebCrawler
+from ..utils.bloom import hash_url
+from ..utils.logger import setup_logger
+from ..utils.url_utils import canonicalize
+
+
+# How long a shard waits on its inbox before re-checking whether the crawl is finished
+POLL_INTERVAL = 0.5
+
+
+def shard_for(key: str, num_shards: int) -> int:
+    """Shard that owns a request, by its unique key (the canonical URL)"""
+    return hash_url(key) % num_shards
+
+
+class ShardedWebCrawler(WebCrawler):
+    """WebCrawler that owns one hash shard of the URL space
+
+    Links belonging to other shards are sent to their owner's inbox; each
+    shard deduplicates only its own URLs, so no shared visited set is needed.
+    A shared count of outstanding URLs (queued or in progress anywhere) tells
+    every shard when the whole crawl has finished. Shard and dedup keys are the
+    Request.unique_key crawlee uses, so crawlee never drops a counted URL, and
+    each URL is uncounted exactly once: when it is finally handled or finally fails.
+    Per-host delays are scheduled in a map shared by all shards, so --delay still
+    holds for a host however many processes crawl it; the page start rate and the
+    handler timeout are scaled to match.
+    """
+
+    keep_alive = True
+
+    def __init__(self, config: Dict, shard_id: int, inboxes: List, outstanding, pages, host_ready, host_lock):
+        self.shard_id = shard_id
+        self.num_shards = len(inboxes)
+        self._inboxes = inboxes
+        self._outstanding = outstanding
+        self._pages = pages
+        self._shared_host_ready = host_ready
+        self._shared_host_lock = host_lock
+        # Foreign URLs recently sent, so nav/footer links aren't re-sent for every page
+        self._sent_recent: OrderedDict[int, None] = OrderedDict()
+        # Requests holding a slot of the global page budget, kept across retries
+        self._claimed: Set[str] = set()
+
+        super().__init__(config)
+
+    def _state_path(self, name: str) -> Path:
+        """Location of a crawl state file for this shard"""
+        return super()._state_path(f'shard-{self.shard_id}') / name
+
+    def _add_outstanding(self, count: int) -> None:
+        with self._outstanding.get_lock():
+            self._outstanding.value += count
+
+    def _max_tasks_per_minute(self) -> float:
+        """Split the site's page start rate between the shards"""
+        return super()._max_tasks_per_minute() / self.num_shards
+
+    def _max_host_wait(self) -> float:
+        """Requests from every shard queue for the same host slots"""
+        return super()._max_host_wait() * self.num_shards
+
+    def _reserve_host_slot(self, host: str) -> float:
+        """Book the host's next request slot across all shards, returning the wait"""
+        with self._shared_host_lock:
+            now = time.time()
+            slot = max(now, self._shared_host_ready.get(host, 0.0))
+            self._shared_host_ready[host] = slot + self.delay
+        return slot - now
+
+    async def _wait_for_host(self, url: str) -> None:
+        """Enforce the configured delay between requests to the same host from any shard"""
+        wait = await asyncio.to_thread(self._reserve_host_slot, urlparse(url).netloc)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def _claim_page(self, key: str) -> bool:
+        """Take a slot of the global page budget for a request, once across retries"""
+        if key in self._claimed:
+            return True
+
+        with self._pages.get_lock():
+            if self._pages.value >= self.max_pages:
+                return False
+            self._pages.value += 1
+
+        self._claimed.add(key)
+        return True
+
+    def _finish(self, key: str) -> None:
+        """Uncount a request that will not be attempted again"""
+        self._claimed.discard(key)
+        self._add_outstanding(-1)
+
+    async def _handle_request(self, context: PlaywrightCrawlingContext) -> None:
+        """Handle a page if the global page budget allows it"""
+        key = context.request.unique_key
+        if self._claim_page(key):
+            # If this raises (e.g. a handler timeout) crawlee retries the request or
+            # reports it to _handle_failed_request, so it is only uncounted once
+            await super()._handle_request(context)
+        else:
+            self._static_pages.pop(context.request.id, None)
+
+        self._finish(key)
+
+    async def _handle_failed_request(self, context: PlaywrightCrawlingContext, error: Exception) -> None:
+        """Handle requests that failed after all retries"""
+        try:
+            await super()._handle_failed_request(context, error)
+        finally:
+            self._finish(context.request.unique_key)
+
+    async def _enqueue_links(self, context: PlaywrightCrawlingContext, links: List[Link], current_url: str) -> None:
+        """Queue this shard's links locally and send the rest to their owners"""
+        depth = context.request.user_data.get('depth', 0) + 1
+
+        if depth > self.max_depth:
+            return
+
+        new_requests = []
+        for url in self._candidate_urls(links):
+            # Same key the request is queued under (Request.unique_key)
+            key = canonicalize(url)
+            shard = shard_for(key, self.num_shards)
+            if shard == self.shard_id:
+                if self._mark_seen(key, url, depth):
+                    new_requests.append(self._new_request(url, depth, key))
+                continue
+
+            h = hash_url(key)
+            if h in self._sent_recent:
+                self._sent_recent.move_to_end(h)
+                continue
+            self._sent_recent[h] = None
+            if len(self._sent_recent) > RECENT_CACHE_SIZE:
+                self._sent_recent.popitem(last=False)
+
+            # Count before sending so the total can't drop to zero while the URL is in flight
+            self._add_outstanding(1)
+            self._inboxes[shard].put((url, depth, key))
+
+        if new_requests:
+            # Queued right away (not via context.add_requests, which is dropped if the
+            # handler fails) so every counted, seen URL really is in the queue
+            self._add_outstanding(len(new_requests))
+            await self.crawler.add_requests(new_requests)
+
+    async def _initial_requests(self) -> List[Request]:
+        """Shards are seeded through their inbox by the coordinator"""
+        return []
+
+    async def _pull_inbox(self) -> None:
+        """Feed URLs sent by other shards into the local queue until the crawl is done"""
+        inbox = self._inboxes[self.shard_id]
+
+        while self._outstanding.value > 0 and self._pages.value < self.max_pages:
+            try:
+                url, depth, key = await asyncio.to_thread(inbox.get, True, POLL_INTERVAL)
+            except queue.Empty:
+                continue
+
+            if self._mark_seen(key, url, depth):
+                await self.crawler.add_requests([self._new_request(url, depth, key)])
+            else:
+                self._add_outstanding(-1)
+
+        self.crawler.stop()
+
+    async def crawl(self) -> None:
+        """Crawl this shard until every shard has run out of work"""
+        puller = asyncio.create_task(self._pull_inbox())
+        try:
+            await super().crawl()
+        finally:
+            puller.cancel()
+            # Don't block process exit on URLs no shard will read any more
+            for inbox in self._inboxes:
+                inbox.cancel_join_thread()
+
+
+def _worker_main(config: Dict, shard_id: int, inboxes: List, outstanding, pages, host_ready, host_lock, log_level: int) -> None:
+    """Entry point of a shard worker process"""
+    setup_logger(log_level)
+    crawler = ShardedWebCrawler(config, shard_id, inboxes, outstanding, pages, host_ready, host_lock)
+
+    loop_factory = uvloop.new_event_loop if uvloop is not None else None
+    with asyncio.Runner(loop_factory=loop_factory) as runner:
+        runner.run(crawler.crawl())
+
+
+def _supervise(workers: List) -> List[str]:
+    """Wait for the worker processes, stopping them all once one fails
+
+    A dead shard leaves its URLs counted as outstanding, so the others would
+    otherwise wait for them forever. Returns the names of the failed workers.
+    """
+    logger = logging.getLogger(__name__)
+    running = list(workers)
+    failed = []
+
+    while running:
+        wait([worker.sentinel for worker in running])
+        for worker in [worker for worker in running if worker.exitcode is not None]:
+            running.remove(worker)
+            if worker.exitcode == 0:
+                continue
+
+            failed.append(worker.name)
+            if len(failed) == 1:
+                logger.error(f"{worker.name} exited with code {worker.exitcode}; stopping the other shards")
+                for other in running:
+                    other.terminate()
+
+    for worker in workers:
+        worker.join()
+    return failed
+
+
+def run_sharded(config: Dict, num_workers: int) -> None:
+    """Crawl with num_workers processes, each owning a hash shard of the URLs"""
+    if num_workers < 1:
+        raise ValueError(f"num_workers must be at least 1, got {num_workers}")
+
+    logger = logging.getLogger(__name__)
+    # Spawn fresh interpreters: this runs in a worker thread next to the parent's event
+    # loop, and forking a multi-threaded process can deadlock children on inherited locks
+    ctx = multiprocessing.get_context('spawn')
+
+    if config.get('resume'):
+        logger.warning("Resuming is not supported with multiple workers; starting a fresh crawl")
+        config = {**config, 'resume': False}
+
+    inboxes = [ctx.Queue() for _ in range(num_workers)]
+    outstanding = ctx.Value('q', 0)
+    pages = ctx.Value('q', 0)
+    # Next free request time per host, shared so shards don't each apply the delay separately
+    manager = ctx.Manager()
+    host_ready = manager.dict()
+    host_lock = ctx.Lock()
+
+    # Seed the start URL to its owning shard
+    start_url = config['start_url']
+    start_key = canonicalize(start_url)
+    outstanding.value = 1
+    inboxes[shard_for(start_key, num_workers)].put((start_url, 0, start_key))
+
+    log_level = logging.getLogger('crawler').getEffectiveLevel()
+    workers = [
+        ctx.Process(
+            target=_worker_main,
+            args=(config, shard_id, inboxes, outstanding, pages, host_ready, host_lock, log_level),
+            name=f'crawler-shard-{shard_id}',
+        )
+        for shard_id in range(num_workers)
+    ]
+
+    logger.info(f"Starting {num_workers} crawler processes")
+    try:
+        for worker in workers:
+            worker.start()
+        failed = _supervise(workers)
+    finally:
+        manager.shutdown()
+
+    if failed:
+        raise RuntimeError(f"Crawler processes failed: {', '.join(failed)}")
+
+    logger.info(f"Sharded crawl completed. Visited {pages.value} pages.")
@@ -3,21 +3,78 @@ Core web crawler implementation using crawlee
 """
 
 import asyncio
-from typing import Dict, Set, Optional
+import os
+import time
+from collections import OrderedDict
+from datetime import timedelta
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
 from urllib.parse import urljoin, urlparse
 import logging
 
-from crawlee import Request
-from crawlee.crawlers import PlaywrightCrawler, PlaywrightCrawlingContext
-from playwright.async_api import Page
+from crawlee import ConcurrencySettings, Request
+from crawlee.browsers import BrowserPool, PlaywrightBrowserPlugin
+from crawlee.crawlers import PlaywrightCrawler, PlaywrightCrawlingContext, PlaywrightPreNavCrawlingContext
+from playwright.async_api import Page, Route
 
+from .fast_fetch import create_client, parse_static_page, try_static
+from .state import CrawlState
 from ..storage.writer import MarkdownWriter
-from ..utils.url_utils import URLUtils
+from ..utils.bloom import BloomFilter, hash_url
+from ..utils.url_utils import canonicalize, get_domain, is_crawlable, navigation_url
+
+
+# URL prefixes of links the crawler can fetch
+_HTTP_SCHEMES = ('http://', 'https://')
+
+# Processed link: (absolute_url, text, is_external)
+Link = Tuple[str, str, bool]
+
+# Number of recently seen URL hashes kept in the exact LRU in front of the Bloom filter
+RECENT_CACHE_SIZE = 4096
+
+# Pages crawled between checkpoints of the on-disk crawl state
+CHECKPOINT_INTERVAL = 100
+
+# Seconds a page may take to load and process, on top of its wait for the host delay
+HANDLER_TIMEOUT = 60
+
+# Resource types whose bytes are never needed (asset URLs are still read from the DOM)
+BLOCKED_RESOURCE_TYPES = frozenset({'image', 'media', 'font', 'stylesheet'})
+
+# Reads from the live DOM what the serialized HTML can't provide, in a single
+# CDP round-trip: the rendered text (opt-in, for SPAs) and links/assets for pages
+# whose HTML yielded no links. Assets are read before scripts/styles are stripped.
+PAGE_DATA_JS = '''(options) => {
+    const assets = options.assets ? {
+        css: Array.from(document.querySelectorAll('link[rel="stylesheet"]')).map(el => el.href),
+        js: Array.from(document.querySelectorAll('script[src]')).map(el => el.src),
+        images: Array.from(document.querySelectorAll('img[src]')).map(el => el.src)
+    } : null;
+
+    let text = null;
+    if (options.text) {
+        document.querySelectorAll('script, style').forEach(el => el.remove());
+        text = document.body ? document.body.innerText : '';
+    }
+
+    return {
+        text: text,
+        links: options.links ? Array.from(document.querySelectorAll('a[href]')).map(link => ({
+            href: link.href,
+            text: link.textContent.trim()
+        })) : null,
+        assets: assets
+    };
+}'''
 
 
 class WebCrawler:
     """Main web crawler class using crawlee and playwright"""
     
+    # Keep running with an empty queue (for crawlers fed from outside, e.g. shards)
+    keep_alive = False
+    
     def __init__(self, config: Dict):
         self.config = config
         self.start_url = config['start_url']
@@ -28,156 +85,354 @@ class WebCrawler:
         self.follow_external = config.get('follow_external', False)
         self.include_assets = config.get('include_assets', False)
         self.mappings = config.get('mappings', None)
+        self.concurrency = config.get('concurrency', 10)
+        self.resume = config.get('resume', False)
+        # Read page text via the browser's innerText instead of parsing the HTML (for SPAs)
+        self.js_text_extract = config.get('js_text_extract', False)
+        # CSS selector mappings and innerText extraction need a live DOM, so they always go through the browser
+        self.fast_path = config.get('fast_path', True) and not self.mappings and not self.js_text_extract
         
-        self.visited_urls: Set[str] = set()
-        self.page_count = 0
         self.base_domain = urlparse(self.start_url).netloc
+        # Lowercased, www-less base domain used for per-link external checks
+        self._base_domain = self.base_domain.lower().removeprefix('www.')
+        
+        # URL dedup: Bloom filter over URL hashes plus a small exact LRU of recent hits
+        self.seen_path = self._state_path('.seen.bloom')
+        self.seen = self._load_seen()
+        self.recent: OrderedDict[int, None] = OrderedDict()
+        
+        # On-disk crawl state, updated in batches every CHECKPOINT_INTERVAL pages
+        self.state = CrawlState(self._state_path('state.db'), reset=not self.resume)
+        self._state_queued: List[Tuple[int, str, int]] = []
+        self._state_done: List[int] = []
+        # Pages crawled by earlier runs still count towards max_pages
+        self.page_count = self.state.count_done() if self.resume else 0
+        
+        # Per-host politeness: next free request time for each host
+        self._host_next_ready: Dict[str, float] = {}
+        
+        # Static-HTML fast path: shared HTTP client and pages fetched without the browser
+        self._http = None
+        self._static_pages: Dict[str, Dict] = {}
         
         self.logger = logging.getLogger(__name__)
         self.writer = MarkdownWriter(self.output_dir, self.base_domain)
         
+        # Pages are handed to a single background writer so disk I/O overlaps fetching
+        self._write_q: asyncio.Queue = asyncio.Queue(maxsize=256)
+        self._writer_task: Optional[asyncio.Task] = None
+        
         # Initialize crawler
         self.crawler = None
         self._setup_crawler()
     
     def _setup_crawler(self):
         """Setup the crawlee playwright crawler"""
+        launch_args = ['--disable-dev-shm-usage', '--disable-blink-features=AutomationControlled']
+        # Chromium's sandbox can't start as root (e.g. in containers); elsewhere it stays on unless asked
+        running_as_root = hasattr(os, 'geteuid') and os.geteuid() == 0
+        if self.config.get('no_sandbox', False) or running_as_root:
+            launch_args.append('--no-sandbox')
+        
+        # Keep one long-lived Chromium with a shared context instead of
+        # relaunching browsers / creating fresh contexts as pages come and go
+        browser_plugin = PlaywrightBrowserPlugin(
+            browser_type='chromium',
+            browser_launch_options={
+                'headless': self.config.get('headless', True),
+                'args': launch_args,
+            },
+            browser_new_context_options={
+                'java_script_enabled': True,
+                'bypass_csp': True,
+                'service_workers': 'block',
+                'viewport': self.config.get('viewport', {'width': 800, 'height': 600}),
+            },
+            max_open_pages_per_browser=50,
+        )
+        browser_pool = BrowserPool(
+            plugins=[browser_plugin],
+            retire_browser_after_page_count=10000,
+        )
+        
+        # Start pages no faster than the host delay allows, and give each handler time
+        # for the longest host-delay wait it can be queued behind before it loads its page
+        concurrency_settings = ConcurrencySettings(
+            desired_concurrency=self.concurrency,
+            max_concurrency=self.concurrency,
+            max_tasks_per_minute=self._max_tasks_per_minute(),
+        )
+        
         self.crawler = PlaywrightCrawler(
-            max_requests_per_crawl=self.max_pages,
+            # Only what is left of the budget: a resumed crawl starts with pages already done
+            max_requests_per_crawl=max(0, self.max_pages - self.page_count),
             request_handler=self._handle_request,
-            # failed_request_handler=self._handle_failed_request,
+            failed_request_handler=self._handle_failed_request,
             max_request_retries=2,
-            # request_handler_timeout_secs=30,
-            # browser_pool_options={
-            #    'use_fingerprints': False,
-            # },
-            # playwright_launch_options={
-             #   'headless': True,
-            #},
+            concurrency_settings=concurrency_settings,
+            request_handler_timeout=timedelta(seconds=HANDLER_TIMEOUT + self._max_host_wait()),
+            browser_pool=browser_pool,
             use_session_pool=False,
+            keep_alive=self.keep_alive,
         )
+        self.crawler.pre_navigation_hook(self._pre_navigation)
+    
+    def _max_tasks_per_minute(self) -> float:
+        """Page start rate that keeps a single-site crawl within the host delay"""
+        # External links spread requests over many hosts, so only the per-host wait applies
+        if self.delay <= 0 or self.follow_external:
+            return float('inf')
+        return 60 / self.delay
+    
+    def _max_host_wait(self) -> float:
+        """Longest a request can wait for its host's delay slots"""
+        # Pages that fall back to the browser after the static fetch book two slots
+        slots_per_page = 2 if self.fast_path else 1
+        return slots_per_page * self.concurrency * self.delay
     
     async def _handle_request(self, context: PlaywrightCrawlingContext) -> None:
         """Handle each crawled page"""
         page = context.page
         request = context.request
         url = request.url
+        # Static page already fetched and parsed over plain HTTP, if any (taken on every path)
+        static_page = self._static_pages.pop(request.id, None)
         
         # Check if we've reached the maximum number of pages
         if self.page_count >= self.max_pages:
             self.logger.info(f"Reached maximum page limit ({self.max_pages})")
             return
         
-        # Mark URL as visited
-        self.visited_urls.add(url)
         self.page_count += 1
         
         self.logger.info(f"Crawling [{self.page_count}/{self.max_pages}]: {url}")
         
         # Extract page content
         try:
-            # Always extract full page content for crawling
-            # Get page title
-            title = await page.title()
-            
-            # Get page HTML
-            html_content = await page.content()
+            page_data = static_page
+            if page_data is not None:
+                html_content = page_data['html']
+            else:
+                # Get page HTML
+                html_content = await page.content()
+                
+                # Title, links, assets and text come from the rendered HTML; only
+                # fall back to the DOM for links/assets when the HTML has none
+                page_data = parse_static_page(html_content, url, text=not self.js_text_extract)
+                from_dom = not page_data['links']
+                
+                if from_dom or self.js_text_extract:
+                    # Read whatever is still missing from the DOM in one evaluate call
+                    dom_data = await page.evaluate(PAGE_DATA_JS, {
+                        'text': self.js_text_extract,
+                        'links': from_dom,
+                        'assets': from_dom and self.include_assets,
+                    })
+                    page_data.update({key: value for key, value in dom_data.items() if value is not None})
             
-            # Extract text content for markdown
-            text_content = await self._extract_text_content(page)
+            title = page_data['title']
+            text_content = page_data['text']
             
-            # Extract links - always extract for crawling
-            links = await self._extract_links(page, url)
+            # Process links - always extract for crawling
+            links = self._extract_links(page_data['links'], url)
             
-            # Extract assets if requested
+            # Process assets if requested
             assets = []
             if self.include_assets:
-                assets = await self._extract_assets(page, url)
+                assets = self._extract_assets(page_data['assets'], url)
             
             # If we have mappings, also extract mapped content for storage
             mapped_content = None
             if self.mappings:
                 mapped_content = await self._extract_mapped_content(page)
             
-            # Save page content with optional mappings
-            await self.writer.save_page(
-                url=url,
-                title=title,
-                content=text_content,
-                html=html_content,
-                links=links,
-                assets=assets,
-                mapped_content=mapped_content  # Pass mappings to writer
-            )
-            
-            # Add delay between requests
-            await asyncio.sleep(self.delay)
+            # Queue page content with optional mappings for the writer task
+            await self._write_q.put({
+                'url': url,
+                'title': title,
+                'content': text_content,
+                'html': html_content,
+                'links': links,
+                'assets': assets,
+                'mapped_content': mapped_content  # Pass mappings to writer
+            })
             
             # Always enqueue new URLs for crawling
             await self._enqueue_links(context, links, url)
             
+            self._state_done.append(hash_url(request.unique_key))
+            if self.page_count % CHECKPOINT_INTERVAL == 0:
+                await self._checkpoint()
+            
         except Exception as e:
             self.logger.error(f"Error processing {url}: {e}")
     
+    async def _writer_loop(self) -> None:
+        """Save queued pages one at a time until the None sentinel arrives"""
+        while True:
+            item = await self._write_q.get()
+            try:
+                if item is None:
+                    return
+                
+                # MarkdownWriter takes links as {url, text, is_external} dicts
+                item['links'] = [
+                    {'url': url, 'text': text, 'is_external': is_external}
+                    for url, text, is_external in item['links']
+                ]
+                await self.writer.save_page(**item)
+            except Exception as e:
+                self.logger.error(f"Error saving {item['url']}: {e}")
+            finally:
+                self._write_q.task_done()
+    
+    async def _pre_navigation(self, context: PlaywrightPreNavCrawlingContext) -> None:
+        """Rate-limit per host and serve static pages without rendering them"""
+        request = context.request
+        url = request.url
+        # Drop data left by an earlier attempt whose navigation failed
+        self._static_pages.pop(request.id, None)
+        
+        # Wait for this host's delay window before hitting it again
+        await self._wait_for_host(url)
+        
+        if not self.include_assets:
+            await context.page.route('**/*', self._block_resources)
+        
+        if self._http is None:
+            return
+        
+        static = await try_static(url, self._http)
+        if static is None:
+            # The browser is about to request the same host again
+            await self._wait_for_host(url)
+            return
+        
+        html, _ = static
+        page_data = parse_static_page(html, url)
+        page_data['html'] = html
+        self._static_pages[request.id] = page_data
+        self.logger.debug(f"Using static fast path for {url}")
+        
+        # Satisfy the browser navigation with a stub so Chromium doesn't fetch or render the page
+        async def fulfill_stub(route: Route) -> None:
+            await route.fulfill(status=200, content_type='text/html', body='<html></html>')
+        
+        # Chromium normalizes the URL it navigates to (e.g. adds a trailing slash to a bare host)
+        target = navigation_url(url)
+        await context.page.route(lambda route_url: navigation_url(route_url) == target, fulfill_stub, times=1)
+    
+    async def _block_resources(self, route: Route) -> None:
+        """Abort requests for images, media, fonts and stylesheets"""
+        if route.request.resource_type in BLOCKED_RESOURCE_TYPES:
+            await route.abort()
+        else:
+            await route.fallback()
+    
+    def _reserve_host_slot(self, host: str) -> float:
+        """Book the host's next request slot, returning how long to wait for it"""
+        now = time.monotonic()
+        slot = max(now, self._host_next_ready.get(host, 0.0))
+        self._host_next_ready[host] = slot + self.delay
+        return slot - now
+    
+    async def _wait_for_host(self, url: str) -> None:
+        """Enforce the configured delay between requests to the same host"""
+        # Slots are booked up front, so waiting requests don't hold up each other's bookings
+        wait = self._reserve_host_slot(urlparse(url).netloc)
+        if wait > 0:
+            await asyncio.sleep(wait)
+    
+    def _state_path(self, name: str) -> Path:
+        """Location of a crawl state file for this site"""
+        return Path(self.output_dir) / self.base_domain / name
+    
+    def _load_seen(self) -> BloomFilter:
+        """Create the seen-URL filter, restoring it from disk when resuming"""
+        if self.resume and self.seen_path.exists():
+            try:
+                seen = BloomFilter.load(self.seen_path)
+                self.logger.info(f"Resumed seen-URL filter with {len(seen)} URLs")
+                return seen
+            except (OSError, ValueError) as e:
+                self.logger.warning(f"Failed to load seen-URL filter: {e}")
+        
+        return BloomFilter(capacity=self.max_pages * 50, error_rate=0.01)
+    
+    def _new_request(self, url: str, depth: int, key: Optional[str] = None) -> Request:
+        """Build a crawl request whose unique key is the URL's canonical form"""
+        return Request.from_url(
+            url,
+            unique_key=key or canonicalize(url),
+            user_data={'depth': depth}
+        )
+    
+    def _mark_seen(self, key: str, url: str, depth: int) -> bool:
+        """Record a request key as seen, returning True if it had not been seen before
+        
+        Keys are the canonical URLs used as Request.unique_key, so this dedup
+        agrees with crawlee's own and never admits a request crawlee would drop.
+        """
+        h = hash_url(key)
+        
+        recent = self.recent
+        if h in recent:
+            recent.move_to_end(h)
+            return False
+        recent[h] = None
+        if len(recent) > RECENT_CACHE_SIZE:
+            recent.popitem(last=False)
+        
+        if not self.seen.add(h):
+            return False
+        
+        self._state_queued.append((h, url, depth))
+        return True
+    
+    async def _checkpoint(self) -> None:
+        """Flush queued/completed URLs and the seen-URL filter to disk"""
+        # Take the filter together with the batches: URLs seen while the writes run
+        # belong to the next checkpoint, or resuming would skip them without a state row
+        queued, self._state_queued = self._state_queued, []
+        done, self._state_done = self._state_done, []
+        seen = self.seen.copy()
+        
+        try:
+            await asyncio.to_thread(self.state.checkpoint, queued, done)
+            await asyncio.to_thread(seen.save, self.seen_path)
+        except Exception as e:
+            self.logger.warning(f"Failed to checkpoint crawl state: {e}")
+    
     async def _handle_failed_request(self, context: PlaywrightCrawlingContext, error: Exception) -> None:
         """Handle failed requests"""
+        self._static_pages.pop(context.request.id, None)
         self.logger.error(f"Failed to crawl {context.request.url}: {error}")
     
-    async def _extract_text_content(self, page: Page) -> str:
-        """Extract readable text content from the page"""
-        # Remove script and style elements
-        await page.evaluate('''() => {
-            const scripts = document.querySelectorAll('script, style');
-            scripts.forEach(el => el.remove());
-        }''')
-        
-        # Get text content
-        text_content = await page.evaluate('''() => {
-            return document.body ? document.body.innerText : '';
-        }''')
-        
-        return text_content
-    
-    async def _extract_links(self, page: Page, current_url: str) -> list:
-        """Extract all links from the page"""
-        links = await page.evaluate('''() => {
-            const links = Array.from(document.querySelectorAll('a[href]'));
-            return links.map(link => ({
-                href: link.href,
-                text: link.textContent.trim()
-            }));
-        }''')
-        
-        # Process and filter links
+    def _extract_links(self, links: list, current_url: str) -> List[Link]:
+        """Resolve and classify the raw links collected from the page"""
         processed_links = []
+        append = processed_links.append
+        is_external = self._is_external
         for link in links:
             href = link.get('href', '')
             if href:
                 absolute_url = urljoin(current_url, href)
-                processed_links.append({
-                    'url': absolute_url,
-                    'text': link.get('text', ''),
-                    'is_external': not URLUtils.is_same_domain(absolute_url, self.base_domain)
-                })
+                append((absolute_url, link.get('text', ''), is_external(absolute_url)))
         
         return processed_links
     
-    async def _extract_assets(self, page: Page, current_url: str) -> list:
-        """Extract asset URLs (CSS, JS, images)"""
-        assets = await page.evaluate('''() => {
-            const results = {
-                css: Array.from(document.querySelectorAll('link[rel="stylesheet"]')).map(el => el.href),
-                js: Array.from(document.querySelectorAll('script[src]')).map(el => el.src),
-                images: Array.from(document.querySelectorAll('img[src]')).map(el => el.src)
-            };
-            return results;
-        }''')
-        
-        # Convert relative URLs to absolute
-        for asset_type in assets:
-            assets[asset_type] = [urljoin(current_url, url) for url in assets[asset_type]]
-        
-        return assets
+    def _is_external(self, url: str) -> bool:
+        """Check whether a URL is outside the base domain and its subdomains"""
+        host = (get_domain(url) or '').lower().removeprefix('www.')
+        base = self._base_domain
+        return not (host == base or host.endswith('.' + base))
+    
+    def _extract_assets(self, assets: Dict[str, list], current_url: str) -> Dict[str, list]:
+        """Convert the raw asset URLs (CSS, JS, images) to absolute URLs"""
+        return {
+            asset_type: [urljoin(current_url, url) for url in urls]
+            for asset_type, urls in assets.items()
+        }
     
     async def _extract_mapped_content(self, page: Page) -> Dict[str, str]:
         """Extract content based on CSS selector mappings"""
@@ -276,48 +531,91 @@ class WebCrawler:
             self.logger.warning(f"Failed to extract .entry-content: {e}")
             return None
     
-    async def _enqueue_links(self, context: PlaywrightCrawlingContext, links: list, current_url: str) -> None:
+    async def _enqueue_links(self, context: PlaywrightCrawlingContext, links: List[Link], current_url: str) -> None:
         """Add discovered links to the crawl queue"""
         current_depth = context.request.user_data.get('depth', 0)
         
         if current_depth >= self.max_depth:
             return
         
-        for link_data in links:
-            url = link_data['url']
-            is_external = link_data['is_external']
-            
-            # Skip if already visited
-            if url in self.visited_urls:
+        new_requests = []
+        mark_seen = self._mark_seen
+        depth = current_depth + 1
+        for url in self._candidate_urls(links):
+            # Skip if already visited or queued
+            key = canonicalize(url)
+            if not mark_seen(key, url, depth):
                 continue
             
+            new_requests.append(self._new_request(url, depth, key))
+        
+        # Add all new links to the queue in a single call. They go straight to the crawler's
+        # queue: context.add_requests is only committed if the handler succeeds, and these
+        # URLs are already marked seen, so a later timeout would lose them for good
+        if new_requests:
+            await self.crawler.add_requests(new_requests)
+    
+    def _candidate_urls(self, links: List[Link]):
+        """Yield the URLs of links that are eligible for crawling"""
+        follow_external = self.follow_external
+        for url, _, is_external in links:
             # Skip external links if not following them
-            if is_external and not self.follow_external:
+            if is_external and not follow_external:
                 continue
             
             # Skip non-HTTP(S) URLs
-            if not url.startswith(('http://', 'https://')):
+            if not url.startswith(_HTTP_SCHEMES):
+                continue
+            
+            # Skip documents, media and archives
+            if not is_crawlable(url):
                 continue
             
-            # Add to queue
-            await context.add_requests([
-                Request.from_url(
-                    url,
-                    user_data={'depth': current_depth + 1}
-                )
-            ])
+            yield url
+    
+    async def _initial_requests(self) -> List[Request]:
+        """Requests that seed the crawl queue"""
+        # Re-seed URLs left queued by an interrupted crawl
+        requests = []
+        if self.resume:
+            pending = await asyncio.to_thread(self.state.load_pending)
+            requests = [self._new_request(url, depth) for url, depth in pending]
+            self.logger.info(f"Resuming crawl with {len(requests)} queued URLs")
+        
+        # Add the starting URL to the queue
+        start_key = canonicalize(self.start_url)
+        if self._mark_seen(start_key, self.start_url, 0) or not requests:
+            requests.append(self._new_request(self.start_url, 0, start_key))
+        
+        return requests
     
     async def crawl(self) -> None:
         """Start the crawling process"""
-        # Add the starting URL to the queue
-        await self.crawler.add_requests([
-            Request.from_url(
-                self.start_url,
-                user_data={'depth': 0}
-            )
-        ])
+        requests = await self._initial_requests()
+        if requests:
+            await self.crawler.add_requests(requests)
+        
+        if self.fast_path:
+            self._http = create_client(self.config.get('user_agent'))
+        
+        self._writer_task = asyncio.create_task(self._writer_loop())
         
         # Run the crawler
-        await self.crawler.run()
+        try:
+            await self.crawler.run()
+        finally:
+            # Flush pending pages and stop the writer
+            await self._write_q.join()
+            await self._write_q.put(None)
+            await self._writer_task
+            self._writer_task = None
+            
+            if self._http is not None:
+                await self._http.aclose()
+                self._http = None
+            
+            # Persist the crawl state so a later run can resume
+            await self._checkpoint()
+            self.state.close()
         
         self.logger.info(f"Crawling completed. Visited {self.page_count} pages.")
\ No newline at end of file
@@ -0,0 +1,72 @@
+"""
+Fast-path HTTP fetching for static pages that don't need a browser
+"""
+
+import re
+from typing import Dict, Optional, Tuple
+
+import httpx
+from selectolax.lexbor import LexborHTMLParser
+
+from ..utils.html_utils import extract_text, get_title, parse_links_and_assets
+
+
+# Markers of pages that render their content client-side (empty SPA mount points, JS-required notices)
+_JS_RENDERED_RE = re.compile(
+    r'<div[^>]+id=["\'](?:root|app|__next|__nuxt)["\'][^>]*>\s*</div>'
+    r'|enable javascript|javascript is required',
+    re.IGNORECASE,
+)
+
+# Pages smaller than this are assumed to be shells filled in by JavaScript
+_MIN_STATIC_SIZE = 1024
+
+
+def create_client(user_agent: Optional[str] = None) -> httpx.AsyncClient:
+    """Create the shared HTTP client used for static fetches"""
+    headers = {'User-Agent': user_agent} if user_agent else None
+    return httpx.AsyncClient(
+        http2=True,
+        headers=headers,
+        limits=httpx.Limits(max_connections=100, max_keepalive_connections=50),
+    )
+
+
+async def try_static(url: str, client: httpx.AsyncClient) -> Optional[Tuple[str, str]]:
+    """Fetch a URL over plain HTTP, returning (html, content_type) for static HTML pages"""
+    try:
+        # Stream so the body is only downloaded once the headers show a usable HTML page
+        async with client.stream('GET', url, follow_redirects=False, timeout=10) as response:
+            # Redirects are left to the browser so relative links resolve against the right URL
+            content_type = response.headers.get('content-type', '')
+            if response.status_code != 200 or 'text/html' not in content_type:
+                return None
+
+            await response.aread()
+            html = response.text
+    except (httpx.HTTPError, httpx.InvalidURL, ValueError):
+        # URLs httpx can't encode (e.g. IDNA errors) and undecodable bodies are left to the browser
+        return None
+
+    if not is_static_html(html):
+        return None
+
+    return html, content_type
+
+
+def is_static_html(html: str) -> bool:
+    """Heuristically decide whether a page's content is present without running JavaScript"""
+    return len(html) >= _MIN_STATIC_SIZE and not _JS_RENDERED_RE.search(html)
+
+
+def parse_static_page(html: str, url: str, text: bool = True) -> Dict:
+    """Extract title, text, links and assets from raw HTML (text is None when not requested)"""
+    tree = LexborHTMLParser(html)
+    links, assets = parse_links_and_assets(html, url, tree)
+
+    return {
+        'title': get_title(tree),
+        'text': extract_text(html, tree) if text else None,
+        'links': links,
+        'assets': assets,
+    }
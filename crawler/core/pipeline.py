@@ -4,8 +4,15 @@ Crawler pipeline orchestrator
 
 import asyncio
 import logging
+import os
 from typing import Dict
 
+try:
+    import uvloop
+except ImportError:  # Not available on Windows
+    uvloop = None
+
+from .coordinator import run_sharded
 from .crawler import WebCrawler
 
 
@@ -15,13 +22,21 @@ class CrawlerPipeline:
     def __init__(self, config: Dict):
         self.config = config
         self.logger = logging.getLogger(__name__)
-        self.crawler = WebCrawler(config)
+        
+        # 0 workers means one per two CPU cores
+        workers = config.get('workers', 1)
+        if workers < 0:
+            raise ValueError(f"workers must be 0 or more, got {workers}")
+        self.workers = workers or max(1, (os.cpu_count() or 2) // 2)
+        self.crawler = WebCrawler(config) if self.workers == 1 else None
     
     def run(self) -> None:
         """Run the crawler pipeline"""
         try:
-            # Run the async crawler
-            asyncio.run(self._run_async())
+            # Run the async crawler, on uvloop when it is installed
+            loop_factory = uvloop.new_event_loop if uvloop is not None else None
+            with asyncio.Runner(loop_factory=loop_factory) as runner:
+                runner.run(self._run_async())
         except Exception as e:
             self.logger.error(f"Pipeline execution failed: {e}")
             raise
@@ -33,8 +48,11 @@ class CrawlerPipeline:
         # Pre-crawl setup
         await self._pre_crawl()
         
-        # Run the crawler
-        await self.crawler.crawl()
+        # Run the crawler, sharded across processes when using several workers
+        if self.crawler is not None:
+            await self.crawler.crawl()
+        else:
+            await asyncio.to_thread(run_sharded, self.config, self.workers)
         
         # Post-crawl cleanup
         await self._post_crawl()
@@ -0,0 +1,74 @@
+"""
+On-disk crawl state for resumable crawls
+"""
+
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Iterable, List, Tuple, Union
+
+
+STATUS_QUEUED = 0
+STATUS_DONE = 1
+
+
+def _to_signed(h: int) -> int:
+    """Map an unsigned 64-bit hash onto SQLite's signed INTEGER range"""
+    return h - (1 << 64) if h >= (1 << 63) else h
+
+
+class CrawlState:
+    """SQLite-backed record of queued and completed URLs"""
+
+    def __init__(self, path: Union[str, Path], reset: bool = False):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        # Checkpoints run in worker threads, one at a time
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS urls (
+                url_hash INTEGER PRIMARY KEY,
+                url TEXT NOT NULL,
+                status INTEGER NOT NULL,
+                depth INTEGER NOT NULL
+            )
+        ''')
+        if reset:
+            self._conn.execute('DELETE FROM urls')
+        self._conn.commit()
+
+    def checkpoint(self, queued: Iterable[Tuple[int, str, int]], done: Iterable[int]) -> None:
+        """Record newly queued (hash, url, depth) entries and completed URL hashes"""
+        with self._lock, self._conn:
+            self._conn.executemany(
+                'INSERT OR IGNORE INTO urls (url_hash, url, status, depth) VALUES (?, ?, ?, ?)',
+                ((_to_signed(h), url, STATUS_QUEUED, depth) for h, url, depth in queued)
+            )
+            self._conn.executemany(
+                'UPDATE urls SET status = ? WHERE url_hash = ?',
+                ((STATUS_DONE, _to_signed(h)) for h in done)
+            )
+
+    def load_pending(self) -> List[Tuple[str, int]]:
+        """Return (url, depth) for every URL queued but not yet crawled"""
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT url, depth FROM urls WHERE status = ?', (STATUS_QUEUED,)
+            )
+            return rows.fetchall()
+
+    def count_done(self) -> int:
+        """Number of URLs already crawled"""
+        with self._lock:
+            return self._conn.execute(
+                'SELECT COUNT(*) FROM urls WHERE status = ?', (STATUS_DONE,)
+            ).fetchone()[0]
+
+    def close(self) -> None:
+        """Close the underlying database connection"""
+        with self._lock:
+            self._conn.close()
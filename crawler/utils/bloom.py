@@ -0,0 +1,88 @@
+"""
+Compact Bloom filter for URL deduplication
+"""
+
+import copy
+import hashlib
+import math
+import os
+from pathlib import Path
+from typing import Union
+
+
+def hash_url(url: str) -> int:
+    """Hash a URL to a 64-bit integer"""
+    return int.from_bytes(hashlib.blake2b(url.encode('utf-8'), digest_size=8).digest(), 'little')
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over 64-bit URL hashes"""
+
+    def __init__(self, capacity: int, error_rate: float = 0.01):
+        self.capacity = max(capacity, 1)
+        self.error_rate = error_rate
+
+        # m = -n*ln(p)/(ln2)^2 bits, k = (m/n)*ln2 hash functions
+        self.num_bits = max(8, int(-self.capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.num_hashes = max(1, round(self.num_bits / self.capacity * math.log(2)))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+
+    def _positions(self, h: int):
+        """Derive bit positions from a 64-bit hash using double hashing"""
+        h1 = h & 0xFFFFFFFF
+        h2 = (h >> 32) | 1
+        m = self.num_bits
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % m
+
+    def add(self, h: int) -> bool:
+        """Add a hash to the filter, returning True if it was not already present"""
+        bits = self.bits
+        added = False
+        for pos in self._positions(h):
+            byte, mask = pos >> 3, 1 << (pos & 7)
+            if not bits[byte] & mask:
+                bits[byte] |= mask
+                added = True
+        if added:
+            self.count += 1
+        return added
+
+    def __contains__(self, h: int) -> bool:
+        bits = self.bits
+        return all(bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(h))
+
+    def __len__(self) -> int:
+        return self.count
+
+    def copy(self) -> 'BloomFilter':
+        """Independent snapshot of the filter"""
+        clone = copy.copy(self)
+        clone.bits = bytearray(self.bits)
+        return clone
+
+    def save(self, path: Union[str, Path]) -> None:
+        """Persist the filter to disk, replacing any previous file atomically"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        header = f"{self.capacity} {self.error_rate} {self.count}\n".encode('ascii')
+
+        # Write next to the target and swap it in, so a crash never leaves a truncated filter
+        tmp_path = path.with_name(path.name + '.tmp')
+        tmp_path.write_bytes(header + bytes(self.bits))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> 'BloomFilter':
+        """Load a filter previously written with save()"""
+        data = Path(path).read_bytes()
+        header, bits = data.split(b'\n', 1)
+        capacity, error_rate, count = header.decode('ascii').split()
+
+        bloom = cls(int(capacity), float(error_rate))
+        if len(bits) != len(bloom.bits):
+            raise ValueError(f"Corrupt Bloom filter file: {path}")
+        bloom.bits = bytearray(bits)
+        bloom.count = int(count)
+        return bloom
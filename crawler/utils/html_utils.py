@@ -0,0 +1,82 @@
+"""
+HTML parsing utilities for the crawler
+"""
+
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urljoin
+
+from selectolax.lexbor import LexborHTMLParser
+
+
+# Elements that start a new line of text, as they do in the browser's innerText
+_BLOCK_SELECTOR = ', '.join((
+    'address', 'article', 'aside', 'blockquote', 'br', 'caption', 'dd', 'details', 'div',
+    'dl', 'dt', 'fieldset', 'figcaption', 'figure', 'footer', 'form', 'h1', 'h2', 'h3',
+    'h4', 'h5', 'h6', 'header', 'hr', 'li', 'main', 'nav', 'ol', 'p', 'pre', 'section',
+    'summary', 'table', 'tr', 'ul',
+))
+
+# Control character marking line breaks in the raw text (real whitespace is collapsed)
+_LINE_BREAK = '\x1f'
+
+
+def _base_url(tree: LexborHTMLParser, url: str) -> str:
+    """Resolve the document base URL, honouring <base href>"""
+    base = tree.css_first('base[href]')
+    if base is not None and base.attributes.get('href'):
+        return urljoin(url, base.attributes['href'])
+    return url
+
+
+def _sources(tree: LexborHTMLParser, selector: str, attr: str, base: str) -> List[str]:
+    """Absolute URLs from an attribute of every element matching a selector"""
+    return [urljoin(base, node.attributes[attr]) for node in tree.css(selector) if node.attributes.get(attr)]
+
+
+def get_title(tree: LexborHTMLParser) -> str:
+    """Text of the document <title>"""
+    node = tree.css_first('title')
+    return ' '.join(node.text().split()) if node is not None else ''
+
+
+def parse_links_and_assets(html: str, url: str, tree: Optional[LexborHTMLParser] = None) -> Tuple[List[Dict], Dict[str, List[str]]]:
+    """Extract links ({href, text}) and asset URLs (css, js, images) from HTML"""
+    if tree is None:
+        tree = LexborHTMLParser(html)
+    base = _base_url(tree, url)
+
+    links = [
+        {'href': urljoin(base, node.attributes['href']), 'text': node.text(deep=True).strip()}
+        for node in tree.css('a[href]')
+        if node.attributes.get('href')
+    ]
+    assets = {
+        'css': _sources(tree, 'link[rel~="stylesheet"]', 'href', base),
+        'js': _sources(tree, 'script[src]', 'src', base),
+        'images': _sources(tree, 'img[src]', 'src', base),
+    }
+    return links, assets
+
+
+def extract_text(html: str, tree: Optional[LexborHTMLParser] = None) -> str:
+    """Readable text of the document body (modifies the tree, so call it last)"""
+    if tree is None:
+        tree = LexborHTMLParser(html)
+
+    body = tree.body
+    if body is None:
+        return ''
+
+    for node in body.css('script, style, noscript, iframe, template'):
+        node.decompose()
+
+    # Break lines only around block elements, so inline markup (links, bold, spans)
+    # stays inside its sentence, then collapse whitespace within each line
+    for node in body.css(_BLOCK_SELECTOR):
+        node.insert_before(_LINE_BREAK)
+        node.insert_after(_LINE_BREAK)
+    for node in body.css('td, th'):
+        node.insert_after(' ')
+
+    lines = (' '.join(chunk.split()) for chunk in body.text(separator='').split(_LINE_BREAK))
+    return '\n'.join(line for line in lines if line)
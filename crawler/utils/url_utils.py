@@ -2,98 +2,158 @@
 URL utilities for the crawler
 """
 
-from urllib.parse import urlparse, urljoin, urlunparse
+from functools import lru_cache
+from urllib.parse import ParseResult, parse_qsl, urlencode, urlparse, urljoin, urlsplit, urlunparse, urlunsplit
 from typing import Optional
 
 
-class URLUtils:
-    """Utility functions for URL handling"""
+# File extensions that are never crawled (tuple so str.endswith checks them all in one call)
+_SKIP_EXTS = (
+    '.pdf', '.doc', '.docx', '.xls', '.xlsx', '.ppt', '.pptx',
+    '.zip', '.rar', '.tar', '.gz', '.7z',
+    '.mp3', '.mp4', '.avi', '.mov', '.wmv', '.flv',
+    '.jpg', '.jpeg', '.png', '.gif', '.bmp', '.svg', '.ico',
+    '.exe', '.dmg', '.pkg', '.deb', '.rpm'
+)
+
+
+# Query parameters that only carry tracking data and never change page content
+_TRACKING = frozenset({
+    'utm_source', 'utm_medium', 'utm_campaign', 'utm_term', 'utm_content',
+    'gclid', 'fbclid', 'mc_cid', 'mc_eid'
+})
+
+_DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+
+@lru_cache(maxsize=131072)
+def _parse(url: str) -> ParseResult:
+    """Parse a URL, caching results for links repeated across pages (nav bars, footers)"""
+    return urlparse(url)
+
+
+@lru_cache(maxsize=1024)
+def _strip_www(domain: str) -> str:
+    """Lowercase a domain and drop its www. prefix for comparison"""
+    return domain.lower().replace('www.', '')
+
+
+def normalize_url(url: str) -> str:
+    """Normalize a URL for consistent comparison"""
+    parsed = _parse(url.lower())
     
-    @staticmethod
-    def normalize_url(url: str) -> str:
-        """Normalize a URL for consistent comparison"""
-        parsed = urlparse(url.lower())
-        
-        # Remove default ports
-        netloc = parsed.netloc
-        if parsed.port == 80 and parsed.scheme == 'http':
-            netloc = parsed.hostname
-        elif parsed.port == 443 and parsed.scheme == 'https':
-            netloc = parsed.hostname
-        
-        # Remove trailing slash from path
-        path = parsed.path.rstrip('/')
-        if not path:
-            path = '/'
-        
-        # Remove fragment
-        normalized = urlunparse((
-            parsed.scheme,
-            netloc,
-            path,
-            parsed.params,
-            parsed.query,
-            ''  # Remove fragment
-        ))
-        
-        return normalized
+    # Remove default ports
+    netloc = parsed.netloc
+    if parsed.port == 80 and parsed.scheme == 'http':
+        netloc = parsed.hostname
+    elif parsed.port == 443 and parsed.scheme == 'https':
+        netloc = parsed.hostname
     
-    @staticmethod
-    def is_valid_url(url: str) -> bool:
-        """Check if a URL is valid"""
-        try:
-            result = urlparse(url)
-            return all([result.scheme, result.netloc])
-        except:
-            return False
+    # Remove trailing slash from path
+    path = parsed.path.rstrip('/')
+    if not path:
+        path = '/'
     
-    @staticmethod
-    def is_same_domain(url: str, domain: str) -> bool:
-        """Check if a URL belongs to the same domain"""
-        try:
-            parsed = urlparse(url)
-            url_domain = parsed.netloc.lower()
-            domain = domain.lower()
-            
-            # Remove www. prefix for comparison
-            url_domain = url_domain.replace('www.', '')
-            domain = domain.replace('www.', '')
-            
-            return url_domain == domain or url_domain.endswith(f'.{domain}')
-        except:
-            return False
+    # Remove fragment
+    normalized = urlunparse((
+        parsed.scheme,
+        netloc,
+        path,
+        parsed.params,
+        parsed.query,
+        ''  # Remove fragment
+    ))
     
-    @staticmethod
-    def get_domain(url: str) -> Optional[str]:
-        """Extract domain from URL"""
-        try:
-            parsed = urlparse(url)
-            return parsed.netloc
-        except:
-            return None
+    return normalized
+
+
+def _normalize_origin(url: str):
+    """Split a URL, lowercasing its scheme and host and dropping default ports"""
+    try:
+        parts = urlsplit(url)
+        port = parts.port
+    except ValueError:
+        return None
+    scheme = parts.scheme.lower()
     
-    @staticmethod
-    def make_absolute(base_url: str, relative_url: str) -> str:
-        """Convert a relative URL to absolute"""
-        return urljoin(base_url, relative_url)
+    # Lowercase the host only; paths and queries can be case-sensitive
+    netloc = parts.hostname or ''
+    if ':' in netloc:
+        netloc = f'[{netloc}]'
+    if port is not None and port != _DEFAULT_PORTS.get(scheme):
+        netloc = f'{netloc}:{port}'
+    if '@' in parts.netloc:
+        netloc = f"{parts.netloc.rsplit('@', 1)[0]}@{netloc}"
     
-    @staticmethod
-    def is_crawlable(url: str) -> bool:
-        """Check if URL should be crawled (exclude certain file types)"""
-        # File extensions to skip
-        skip_extensions = {
-            '.pdf', '.doc', '.docx', '.xls', '.xlsx', '.ppt', '.pptx',
-            '.zip', '.rar', '.tar', '.gz', '.7z',
-            '.mp3', '.mp4', '.avi', '.mov', '.wmv', '.flv',
-            '.jpg', '.jpeg', '.png', '.gif', '.bmp', '.svg', '.ico',
-            '.exe', '.dmg', '.pkg', '.deb', '.rpm'
-        }
-        
-        parsed = urlparse(url.lower())
-        path = parsed.path
-        
-        for ext in skip_extensions:
-            if path.endswith(ext):
-                return False
+    return parts, scheme, netloc
+
+
+def canonicalize(url: str) -> str:
+    """Canonical form of a URL used as its deduplication key"""
+    normalized = _normalize_origin(url)
+    if normalized is None:
+        return url
+    parts, scheme, netloc = normalized
+    
+    # Sort query parameters and drop tracking ones
+    query = parts.query
+    if query:
+        params = [
+            (key, value) for key, value in parse_qsl(query, keep_blank_values=True)
+            if key not in _TRACKING and not key.startswith('utm_')
+        ]
+        query = urlencode(sorted(params))
+    
+    return urlunsplit((scheme, netloc, parts.path or '/', query, ''))
+
+
+def navigation_url(url: str) -> str:
+    """URL as a browser requests it when navigating (normalized origin, no fragment)"""
+    normalized = _normalize_origin(url)
+    if normalized is None:
+        return url
+    parts, scheme, netloc = normalized
+    
+    return urlunsplit((scheme, netloc, parts.path or '/', parts.query, ''))
+
+
+def is_valid_url(url: str) -> bool:
+    """Check if a URL is valid"""
+    try:
+        result = _parse(url)
+        return all([result.scheme, result.netloc])
+    except:
+        return False
+
+
+def is_same_domain(url: str, domain: str) -> bool:
+    """Check if a URL belongs to the same domain"""
+    try:
+        # Remove www. prefix for comparison
+        url_domain = _strip_www(_parse(url).netloc)
+        domain = _strip_www(domain)
         
-        return True
\ No newline at end of file
+        return url_domain == domain or url_domain.endswith(f'.{domain}')
+    except:
+        return False
+
+
+def get_domain(url: str) -> Optional[str]:
+    """Extract domain from URL"""
+    try:
+        parsed = _parse(url)
+        return parsed.netloc
+    except:
+        return None
+
+
+def make_absolute(base_url: str, relative_url: str) -> str:
+    """Convert a relative URL to absolute"""
+    return urljoin(base_url, relative_url)
+
+
+def is_crawlable(url: str) -> bool:
+    """Check if URL should be crawled (exclude certain file types)"""
+    # Strip fragment and query without building a full parse result
+    path = url.split('#', 1)[0].split('?', 1)[0].lower()
+    return not path.endswith(_SKIP_EXTS)
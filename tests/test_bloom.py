@@ -0,0 +1,73 @@
+"""
+Tests for the URL Bloom filter
+"""
+
+import pytest
+
+from crawler.utils.bloom import BloomFilter, hash_url
+
+
+def test_hash_url_is_stable_64_bit():
+    h = hash_url('https://example.com/')
+    assert h == hash_url('https://example.com/')
+    assert 0 <= h < 1 << 64
+    assert h != hash_url('https://example.com/a')
+
+
+def test_add_reports_new_entries():
+    bloom = BloomFilter(100)
+    h = hash_url('https://example.com/')
+    assert h not in bloom
+    assert bloom.add(h) is True
+    assert h in bloom
+    assert bloom.add(h) is False
+    assert len(bloom) == 1
+
+
+def test_save_load_round_trip(tmp_path):
+    bloom = BloomFilter(1000, 0.01)
+    hashes = [hash_url(f'https://example.com/page/{i}') for i in range(500)]
+    for h in hashes:
+        bloom.add(h)
+
+    path = tmp_path / 'state' / 'seen.bloom'
+    bloom.save(path)
+    loaded = BloomFilter.load(path)
+
+    assert loaded.bits == bloom.bits
+    assert loaded.capacity == bloom.capacity
+    assert loaded.num_hashes == bloom.num_hashes
+    assert len(loaded) == len(bloom)
+    assert all(h in loaded for h in hashes)
+    assert not (tmp_path / 'state' / 'seen.bloom.tmp').exists()
+
+
+def test_copy_is_independent():
+    bloom = BloomFilter(100)
+    bloom.add(hash_url('https://example.com/a'))
+    snapshot = bloom.copy()
+    bloom.add(hash_url('https://example.com/b'))
+
+    assert hash_url('https://example.com/a') in snapshot
+    assert hash_url('https://example.com/b') not in snapshot
+    assert len(snapshot) == 1
+
+
+def test_load_rejects_truncated_file(tmp_path):
+    path = tmp_path / 'seen.bloom'
+    BloomFilter(1000).save(path)
+    path.write_bytes(path.read_bytes()[:-1])
+
+    with pytest.raises(ValueError):
+        BloomFilter.load(path)
+
+
+def test_false_positive_rate_at_capacity():
+    capacity, error_rate = 20000, 0.01
+    bloom = BloomFilter(capacity, error_rate)
+    for i in range(capacity):
+        bloom.add(hash_url(f'https://example.com/in/{i}'))
+
+    trials = 50000
+    false_positives = sum(hash_url(f'https://example.com/out/{i}') in bloom for i in range(trials))
+    assert false_positives / trials < error_rate * 1.5
@@ -0,0 +1,40 @@
+"""
+Tests for HTML text and link extraction
+"""
+
+from selectolax.lexbor import LexborHTMLParser
+
+from crawler.utils.html_utils import extract_text, get_title, parse_links_and_assets
+
+
+def test_inline_markup_stays_on_one_line():
+    assert extract_text('<p>Hello <b>world</b>!</p>') == 'Hello world!'
+    assert extract_text('<p>See <a href="/x">the <span>docs</span></a> for more.</p>') == 'See the docs for more.'
+
+
+def test_block_elements_start_new_lines():
+    html = '<h1>Title</h1><div>First <em>para</em></div><p>Second</p><ul><li>one</li><li>two</li></ul>'
+    assert extract_text(html) == 'Title\nFirst para\nSecond\none\ntwo'
+
+
+def test_line_breaks_and_source_whitespace():
+    assert extract_text('<p>line one<br>line   two\n   continued</p>') == 'line one\nline two continued'
+
+
+def test_table_cells_are_separated():
+    assert extract_text('<table><tr><td>a</td><td>b</td></tr><tr><td>c</td></tr></table>') == 'a b\nc'
+
+
+def test_script_like_nodes_are_dropped():
+    html = '<body><p>Visible</p><script>var x = 1;</script><style>p {}</style><noscript>Enable JS</noscript></body>'
+    assert extract_text(html) == 'Visible'
+
+
+def test_title_and_links_resolve_against_base():
+    html = '<head><title> My\n Page </title><base href="https://example.com/docs/"></head><a href="a.html">A <b>link</b></a>'
+    tree = LexborHTMLParser(html)
+    links, assets = parse_links_and_assets(html, 'https://example.com/', tree)
+
+    assert get_title(tree) == 'My Page'
+    assert links == [{'href': 'https://example.com/docs/a.html', 'text': 'A link'}]
+    assert assets == {'css': [], 'js': [], 'images': []}
@@ -0,0 +1,53 @@
+"""
+Tests for the SQLite crawl state
+"""
+
+from crawler.core.state import CrawlState
+
+
+# Hashes on both sides of the signed 64-bit boundary
+HIGH_HASHES = [(1 << 63), (1 << 64) - 1, (1 << 63) + 12345]
+LOW_HASHES = [0, 1, (1 << 63) - 1]
+
+
+def test_checkpoint_and_load_pending_with_large_hashes(tmp_path):
+    state = CrawlState(tmp_path / 'state.db')
+    queued = [(h, f'https://example.com/{i}', i % 3) for i, h in enumerate(HIGH_HASHES + LOW_HASHES)]
+    state.checkpoint(queued, [])
+
+    assert sorted(state.load_pending()) == sorted((url, depth) for _, url, depth in queued)
+    assert state.count_done() == 0
+
+    # Marking done must find the rows stored for hashes >= 2**63
+    state.checkpoint([], HIGH_HASHES)
+    assert sorted(state.load_pending()) == sorted((url, depth) for h, url, depth in queued if h not in HIGH_HASHES)
+    assert state.count_done() == len(HIGH_HASHES)
+    state.close()
+
+
+def test_requeue_does_not_reset_done(tmp_path):
+    state = CrawlState(tmp_path / 'state.db')
+    h = (1 << 64) - 1
+    state.checkpoint([(h, 'https://example.com/', 0)], [h])
+    state.checkpoint([(h, 'https://example.com/', 0)], [])
+
+    assert state.load_pending() == []
+    assert state.count_done() == 1
+    state.close()
+
+
+def test_state_persists_and_resets(tmp_path):
+    path = tmp_path / 'state.db'
+    state = CrawlState(path)
+    state.checkpoint([(1 << 63, 'https://example.com/a', 1), (5, 'https://example.com/b', 2)], [5])
+    state.close()
+
+    resumed = CrawlState(path)
+    assert resumed.load_pending() == [('https://example.com/a', 1)]
+    assert resumed.count_done() == 1
+    resumed.close()
+
+    fresh = CrawlState(path, reset=True)
+    assert fresh.load_pending() == []
+    assert fresh.count_done() == 0
+    fresh.close()